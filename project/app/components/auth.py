@@ -1,35 +1,118 @@
 import streamlit as st
 import hashlib
+import hmac
 import os
 import json
+import threading
+import functools
 from typing import Dict, Optional, Tuple, Any
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
 
 # Default admin credentials
 DEFAULT_USERNAME = "admin"
 DEFAULT_PASSWORD = "password123"  # In production, this would be a hashed password
 
+# Argon2id hasher, built once per process. Each encoded hash carries its own
+# parameters, so raising the cost here only affects newly (re)hashed passwords.
+_PH = PasswordHasher(time_cost=3, memory_cost=64 * 1024, parallelism=1)
+_DUMMY_HASH = _PH.hash("dummy-password")
+
 def hash_password(password: str) -> str:
-    """Hash a password using SHA-256."""
-    return hashlib.sha256(password.encode()).hexdigest()
+    """Hash a password using Argon2id."""
+    return _PH.hash(password)
 
-def load_user_credentials() -> Dict[str, str]:
-    """Load user credentials from a file or use defaults."""
+def verify_password(stored_hash: str, password: str) -> bool:
+    """Check a password against a stored Argon2id or legacy SHA-256 hash."""
+    if not stored_hash.startswith("$argon2"):
+        # Legacy unsalted SHA-256 digest
+        legacy_hash = hashlib.sha256(password.encode()).hexdigest()
+        return hmac.compare_digest(stored_hash, legacy_hash)
+    try:
+        return _PH.verify(stored_hash, password)
+    except (VerificationError, InvalidHashError):
+        return False
+
+def burn_verify(password: str) -> None:
+    """Run a verify against a dummy hash so unknown usernames cost as much as real ones."""
+    verify_password(_DUMMY_HASH, password)
+
+# Argon2 checks are deliberately slow, so recent successful checks are
+# remembered per stored hash. Entries hold a keyed BLAKE2b digest of the
+# password (key is random per process), never the plaintext.
+_VERIFY_KEY = os.urandom(32)
+_VERIFIED: Dict[str, bytes] = {}
+_VERIFIED_MAX = 64
+_VERIFIED_LOCK = threading.Lock()
+
+def _password_digest(password: str) -> bytes:
+    """Keyed digest of a password, used only as a verification cache entry."""
+    return hashlib.blake2b(password.encode(), key=_VERIFY_KEY, digest_size=32).digest()
+
+def verify_password_cached(stored_hash: str, password: str) -> bool:
+    """Like verify_password, but reuse a recent successful check of the same pair."""
+    digest = _password_digest(password)
+    with _VERIFIED_LOCK:
+        known = _VERIFIED.get(stored_hash)
+    if known is not None and hmac.compare_digest(known, digest):
+        return True
+    if not verify_password(stored_hash, password):
+        return False
+    with _VERIFIED_LOCK:
+        if len(_VERIFIED) >= _VERIFIED_MAX:
+            # Evict the oldest entry
+            _VERIFIED.pop(next(iter(_VERIFIED)))
+        _VERIFIED[stored_hash] = digest
+    return True
+
+def forget_verified(stored_hash: str) -> None:
+    """Drop the cached verification for a stored hash (e.g. on logout)."""
+    with _VERIFIED_LOCK:
+        _VERIFIED.pop(stored_hash, None)
+
+def needs_rehash(stored_hash: str) -> bool:
+    """Check if a stored hash is legacy or uses outdated Argon2 parameters."""
+    if not stored_hash.startswith("$argon2"):
+        return True
+    try:
+        return _PH.check_needs_rehash(stored_hash)
+    except InvalidHashError:
+        return True
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _load_creds_cached(mtime: float) -> Dict[str, str]:
+    """Parse the credentials file; cached per file modification time."""
+    with open("data/users.json", "r") as f:
+        return json.load(f)
+
+def _read_user_credentials() -> Dict[str, str]:
+    """Read user credentials from a file or use defaults."""
     try:
-        if os.path.exists("data/users.json"):
-            with open("data/users.json", "r") as f:
-                return json.load(f)
+        return _load_creds_cached(os.path.getmtime("data/users.json"))
+    except FileNotFoundError:
+        pass
     except Exception as e:
         st.error(f"Error loading user credentials: {e}")
     
     # Return default credentials if file doesn't exist or has issues
-    return {DEFAULT_USERNAME: hash_password(DEFAULT_PASSWORD)}
+    return {DEFAULT_USERNAME: _default_password_hash()}
+
+@functools.lru_cache(maxsize=1)
+def _default_password_hash() -> str:
+    """Hash the default admin password once per process."""
+    return hash_password(DEFAULT_PASSWORD)
+
+def load_user_credentials() -> Dict[str, str]:
+    """Load user credentials; re-parsed only when the file changes."""
+    return _read_user_credentials()
 
 def save_user_credentials(credentials: Dict[str, str]) -> None:
     """Save user credentials to a file."""
     try:
         os.makedirs("data", exist_ok=True)
         with open("data/users.json", "w") as f:
-            json.dump(credentials, f)
+            f.write(json.dumps(credentials, separators=(",", ":")))
+        _load_creds_cached.clear()
     except Exception as e:
         st.error(f"Error saving user credentials: {e}")
 
@@ -49,8 +132,18 @@ def login_form() -> None:
         
         if login_button:
             credentials = load_user_credentials()
+            stored_hash = credentials.get(username)
             
-            if username in credentials and credentials[username] == hash_password(password):
+            if stored_hash is None:
+                # Unknown user: verify against a dummy hash so the response takes
+                # as long as a real check and does not reveal which usernames exist
+                burn_verify(password)
+                st.error("Invalid username or password")
+            elif verify_password(stored_hash, password):
+                # Upgrade legacy or outdated hashes while we have the plaintext
+                if needs_rehash(stored_hash):
+                    credentials[username] = hash_password(password)
+                    save_user_credentials(credentials)
                 st.session_state.authenticated = True
                 st.session_state.username = username
                 st.rerun()
@@ -83,7 +176,7 @@ def change_password_form() -> None:
             credentials = load_user_credentials()
             username = st.session_state.username
             
-            if username in credentials and credentials[username] == hash_password(current_password):
+            if username in credentials and verify_password(credentials[username], current_password):
                 credentials[username] = hash_password(new_password)
                 save_user_credentials(credentials)
                 st.success("Password changed successfully")
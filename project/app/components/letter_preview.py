@@ -1,24 +1,48 @@
 import streamlit as st
 import os
 import json
+import string
 from typing import Dict, List, Optional, Tuple, Any
 import streamlit.components.v1 as components
-import urllib.parse
+
+from utils.validation import validate_file_upload
+
+# Script appended to the viewer page; only the config JSON varies between renders.
+# It merges the user parameters into the initial config before the viewer is
+# constructed, so the scene and font are only built once.
+_VIEWER_CONFIG_SCRIPT = string.Template("""
+<script>
+    if (typeof viewerConfig !== 'undefined') {
+        Object.assign(viewerConfig, $config);
+    }
+</script>
+""")
+
+@st.cache_resource(show_spinner=False)
+def _read_3d_viewer_html() -> str:
+    """Read the static 3D viewer HTML once per process."""
+    with open(r"project/app/static/html/3d_viewer.html", 'r') as f:
+        return f.read()
 
 def load_3d_viewer_html() -> str:
     """Load the 3D viewer HTML content."""
     try:
-        with open(r"project/app/static/html/3d_viewer.html", 'r') as f:
-            return f.read()
+        return _read_3d_viewer_html()
     except FileNotFoundError:
         st.error("3D viewer HTML file not found")
         return "<div>Error loading 3D preview</div>"
 
+@st.cache_data(ttl=30, show_spinner=False)
+def _list_fonts_cached(mtime: float) -> List[str]:
+    """List font files; cached per fonts directory modification time."""
+    return [f.split('.')[0] for f in os.listdir("data/fonts") if f.endswith('.json')]
+
 def load_available_fonts() -> List[str]:
     """Load available fonts for 3D letters."""
     try:
-        if os.path.exists("data/fonts"):
-            return [f.split('.')[0] for f in os.listdir("data/fonts") if f.endswith('.json')]
+        return _list_fonts_cached(os.path.getmtime("data/fonts"))
+    except FileNotFoundError:
+        pass
     except Exception as e:
         st.error(f"Error loading fonts: {e}")
     
@@ -54,36 +78,19 @@ def render_3d_preview() -> None:
     if letter_props.get('led_lighting', False):
         params['ledLighting'] = 'true'
     
-    # Construct URL query string (not used directly, but could be for iframe src)
-    query_string = '&'.join([f"{k}={urllib.parse.quote(str(v))}" for k, v in params.items()])
+    # Build the viewer config bundle in one pass; JSON encoding also escapes the values
+    config = {k: params[k] for k in ('letters', 'height', 'width', 'depth', 'material', 'finish', 'color', 'font')}
+    if params.get('ledLighting') == 'true':
+        config['ledLighting'] = True
+    config_json = json.dumps(config, separators=(",", ":"))
     
-    # Add a loading spinner while the 3D viewer initializes
-    with st.spinner("Loading 3D preview..."):
-        # Embed the Three.js viewer with custom parameters
-        viewer_html = load_3d_viewer_html()
-        components.html(
-            viewer_html + f"""
-            <script>
-                // Update viewer config with user parameters, including font
-                document.addEventListener('DOMContentLoaded', () => {{
-                    if (typeof viewer !== 'undefined' && viewer) {{
-                        viewer.updateConfig({{
-                            letters: '{params["letters"]}',
-                            height: {params["height"]},
-                            width: {params["width"]},
-                            depth: {params["depth"]},
-                            material: '{params["material"]}',
-                            finish: '{params["finish"]}',
-                            color: '{params["color"]}',
-                            font: '{params["font"]}'  // Pass the font to the viewer
-                            {", ledLighting: true" if params.get("ledLighting") == "true" else ""}
-                        }});
-                    }}
-                }});
-            </script>
-            """, 
-            height=450
-        )
+    # Embed the Three.js viewer with custom parameters; the iframe shows its own
+    # loading overlay while three.js initializes, so no spinner is needed here
+    viewer_html = load_3d_viewer_html()
+    components.html(
+        viewer_html + _VIEWER_CONFIG_SCRIPT.substitute(config=config_json),
+        height=450
+    )
     
     # Interactive controls for the 3D view
     st.caption("Interactive Controls:")
@@ -147,8 +154,8 @@ def update_3d_preview(letters: str, width: float, height: float, depth: float,
         # Multi-color mode
         config['letterColors'] = color_map
     
-    # Convert config to JSON
-    config_json = json.dumps(config)
+    # Convert config to compact JSON
+    config_json = json.dumps(config, separators=(",", ":"))
     
     # Update the 3D model by sending a message to the iframe, including font
     st.markdown(
@@ -159,7 +166,6 @@ def update_3d_preview(letters: str, width: float, height: float, depth: float,
                 const frames = document.getElementsByTagName('iframe');
                 for (let i = 0; i < frames.length; i++) {{
                     try {{
-                        console.log('Updating 3D preview with config:', {config_json});
                         // Send update message to the iframe
                         frames[i].contentWindow.postMessage({{
                             type: 'update_config',
@@ -175,16 +181,6 @@ def update_3d_preview(letters: str, width: float, height: float, depth: float,
         unsafe_allow_html=True
     )
 
-    # For debugging - print the font being sent to the console
-    st.markdown(
-        f"""
-        <script>
-            console.log('Font being sent to 3D preview: {font}');
-        </script>
-        """,
-        unsafe_allow_html=True
-    )
-
 def handle_font_upload() -> None:
     """Handle user font upload."""
     uploaded_font = st.file_uploader("Upload Custom Font (JSON)", type=["json"])
@@ -192,19 +188,23 @@ def handle_font_upload() -> None:
     if uploaded_font is not None:
         # Save the uploaded font
         try:
-            font_data = json.load(uploaded_font)
+            font_bytes = uploaded_font.getvalue()
+            if not validate_file_upload(font_bytes, "json"):
+                st.error("Invalid font file. Please upload a valid JSON font under 5MB.")
+                return
             font_name = uploaded_font.name.split('.')[0]
             
             # Ensure the data directory exists
             os.makedirs("data/fonts", exist_ok=True)
             
-            # Save the font data
-            with open(f"data/fonts/{font_name}.json", "w") as f:
-                json.dump(font_data, f)
+            # Save the validated bytes as-is instead of re-serializing them
+            with open(f"data/fonts/{font_name}.json", "wb") as f:
+                f.write(font_bytes)
             
             st.success(f"Font '{font_name}' uploaded successfully!")
             
             # Update the available fonts list
+            _list_fonts_cached.clear()
             st.session_state.available_fonts = load_available_fonts()
             st.session_state.letter_properties["font"] = font_name
             
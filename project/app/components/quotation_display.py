@@ -1,85 +1,99 @@
+import streamlit as st
+import time
+from typing import Dict, Any
+
+from utils.formatting import format_currency, format_timestamp
+from utils.export import quotation_cache_key, export_to_csv_cached, export_to_pdf_cached
+
+def _render_order_info(quote: Dict[str, Any], quote_idx: int) -> None:
+    """Render the order information block for a saved quotation."""
+    # Order fields are tabular, so send them as one table instead of markdown lines
+    st.markdown("### Order Information")
+    st.table({
+        "Field": ["Quotation #", "Letters", "Font", "Material", "Dimensions",
+                  "Sets of Letters", "Total Letters", "Finish"],
+        "Value": [str(quote_idx + 1), quote['letters'], quote.get('font', 'Default'),
+                  quote['material'], quote['dimensions'], str(quote['quantity']),
+                  str(quote['total_letters']), quote['finish']]
+    })
+    
+    # Color swatches need inline HTML, which tables cannot render
+    if quote.get('multi_color', False):
+        color_md = "### Color Information\n\n" + "\n".join(
+            f"- Letter '{letter}': <span style='color:{color['hex']}'>\u25A0</span> {color['name']}"
+            for letter, color in quote['letter_colors'].items()
+        )
+    else:
+        color_md = f"**Color:** <span style='color:{quote['color_hex']}'>\u25A0</span> {quote['color']}"
+    
+    st.markdown(color_md, unsafe_allow_html=True)
+
+def _render_costs(quote: Dict[str, Any], fmt: Dict[str, str]) -> None:
+    """Render the options and pricing block for a saved quotation."""
+    costs = quote['costs']
+    
+    st.markdown("### Options & Pricing")
+    st.table({
+        "Option": list(quote['options']),
+        "Selected": ['Yes' if selected else 'No' for selected in quote['options'].values()]
+    })
+    
+    # Cost breakdown rows, sent as a single table
+    items = ["Material Cost", "Finish Cost", "Options Cost", "Subtotal"]
+    amounts = [fmt['material_cost'], fmt['finish_cost'], fmt['options_cost'], fmt['subtotal']]
+    
+    # Display discount if applicable
+    if costs.get('discount', 0) > 0:
+        items.append(f"Bulk Discount ({costs['discount_percentage']}%)")
+        amounts.append(f"-{fmt['discount']}")
+    
+    items += ["Tax (10%)", "Final Total"]
+    amounts += [fmt['tax'], fmt['total']]
+    
+    # Display estimated delivery time
+    if 'estimated_delivery_days' in quote:
+        items.append("Production Time")
+        amounts.append(f"{quote['estimated_delivery_days']} business days")
+    
+    st.markdown("### Cost Breakdown")
+    st.table({"Item": items, "Amount": amounts})
+
 def display_quotation_details(quote_idx: int) -> None:
     """Display detailed information for a specific quotation."""
     if 0 <= quote_idx < len(st.session_state.quotations):
         quote = st.session_state.quotations[quote_idx]
         
+        # Format every numeric cost once for this render
+        fmt = {k: format_currency(v) for k, v in quote['costs'].items() if isinstance(v, (int, float))}
+        
         # Display in an expander
         with st.expander("Quotation Details", expanded=True):            
             # Basic information
             col1, col2 = st.columns(2)
             
             with col1:
-                st.markdown("### Order Information")
-                st.markdown(f"**Quotation #:** {quote_idx + 1}")
-                st.markdown(f"**Letters:** {quote['letters']}")
-                st.markdown(f"**Font:** {quote.get('font', 'Default')}")
-                st.markdown(f"**Material:** {quote['material']}")
-                st.markdown(f"**Dimensions:** {quote['dimensions']}")
-                st.markdown(f"**Sets of Letters:** {quote['quantity']}")
-                st.markdown(f"**Total Letters:** {quote['total_letters']}")
-                st.markdown(f"**Finish:** {quote['finish']}")
-                
-                # Display color information
-                if quote.get('multi_color', False):
-                    st.markdown("### Color Information")
-                    for letter, color in quote['letter_colors'].items():
-                        st.markdown(f"- Letter '{letter}': <span style='color:{color['hex']}'>\u25A0</span> {color['name']}", unsafe_allow_html=True)
-                else:
-                    st.markdown(f"**Color:** <span style='color:{quote['color_hex']}'>\u25A0</span> {quote['color']}", unsafe_allow_html=True)
+                _render_order_info(quote, quote_idx)
             
             with col2:
-                st.markdown("### Options & Pricing")
-                # Display selected options
-                st.markdown("**Selected Options:**")
-                for option, selected in quote['options'].items():
-                    st.markdown(f"- {option}: {'Yes' if selected else 'No'}")
-                
-                # Cost breakdown
-                st.markdown("### Cost Breakdown")
-                costs = quote['costs']
-                st.markdown(f"Material Cost: {format_currency(costs['material_cost'])}")
-                st.markdown(f"Finish Cost: {format_currency(costs['finish_cost'])}")
-                st.markdown(f"Options Cost: {format_currency(costs['options_cost'])}")
-                st.markdown(f"**Subtotal:** {format_currency(costs['subtotal'])}")
-                
-                # Display discount if applicable
-                if costs.get('discount', 0) > 0:
-                    st.markdown(f"**Bulk Discount ({costs['discount_percentage']}%):** -{format_currency(costs['discount'])}")
-                
-                st.markdown(f"**Tax (10%):** {format_currency(costs['tax'])}")
-                st.markdown(f"**Final Total:** {format_currency(costs['total'])}")
-                
-                # Display estimated delivery time
-                if 'estimated_delivery_days' in quote:
-                    delivery_days = quote['estimated_delivery_days']
-                    delivery_date = datetime.now().strftime("%B %d, %Y")  # In a real app, calculate from saved date
-                    st.markdown(f"**Production Time:** {delivery_days} business days")
+                _render_costs(quote, fmt)
         
         # Add export tab
         st.markdown("### Export Options")
         
-        # Pre-generate the export data to avoid timing issues
-        csv_data = export_to_csv(quote)
-        pdf_data = export_to_pdf(quote)
-
-
-        # CSV download button
-        st.download_button(
-            label="Download Quotation as CSV",
-            data=csv_data,
-            file_name="quotation.csv",
-            mime="text/csv"
-        )
+        # Pre-generate the CSV, which is cheap; cached so reruns with an
+        # unchanged quote reuse the same bytes
+        quote_key = quotation_cache_key(quote)
+        csv_data = export_to_csv_cached(quote_key, quote)
         
-        # PDF download button
-        st.download_button(
-            label="Download Quotation as PDF",
-            data=pdf_data,
-            file_name="quotation.pdf",
-            mime="application/pdf"
-        )
-
+        # The PDF is only built once requested; keep it with the key of the
+        # quote it was built from so an edited quote is never served stale
+        pdf_state_key = f"pdf_{quote_idx}"
+        prepared = st.session_state.get(pdf_state_key)
+        if prepared is not None and prepared[0] != quote_key:
+            prepared = None
         
+        # One timestamp per render so both file names always agree
+        file_stem = f"quotation_{quote['letters'].replace(' ', '_')}_{format_timestamp(int(time.time()), '%Y%m%d')}"
         
         col1, col2 = st.columns(2)
         
@@ -88,7 +102,7 @@ def display_quotation_details(quote_idx: int) -> None:
             st.download_button(
                 label="Export as CSV",
                 data=csv_data,
-                file_name=f"quotation_{quote['letters'].replace(' ', '_')}_{datetime.now().strftime('%Y%m%d')}.csv",
+                file_name=f"{file_stem}.csv",
                 mime="text/csv",
                 key=f"download_csv_{quote_idx}",
                 use_container_width=True,
@@ -96,13 +110,22 @@ def display_quotation_details(quote_idx: int) -> None:
             )
         
         with col2:
-            # Direct download button with pre-generated PDF data
-            st.download_button(
-                label="Export as PDF", 
-                data=pdf_data,
-                file_name=f"quotation_{quote['letters'].replace(' ', '_')}_{datetime.now().strftime('%Y%m%d')}.pdf",
-                mime="application/pdf",
-                key=f"download_pdf_{quote_idx}",
+            if prepared is None and st.button(
+                "Prepare PDF",
+                key=f"prep_pdf_{quote_idx}",
                 use_container_width=True,
-                help="Download quote as PDF document"
-            )
+                help="Generate the PDF document for download"
+            ):
+                prepared = (quote_key, export_to_pdf_cached(quote_key, quote))
+                st.session_state[pdf_state_key] = prepared
+            
+            if prepared is not None:
+                st.download_button(
+                    label="Export as PDF", 
+                    data=prepared[1],
+                    file_name=f"{file_stem}.pdf",
+                    mime="application/pdf",
+                    key=f"download_pdf_{quote_idx}",
+                    use_container_width=True,
+                    help="Download quote as PDF document"
+                )
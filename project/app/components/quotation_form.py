@@ -1,39 +1,102 @@
 import streamlit as st
 import json
+import functools
 from typing import Dict, List, Optional, Tuple, Any, Union
-import pandas as pd
 
 from utils.calculations import calculate_costs, calculate_delivery_time, calculate_bulk_discount
 from utils.validation import validate_inputs, sanitize_text_input
 from utils.formatting import format_currency
-from utils.export import export_to_csv, export_to_pdf
+from utils.export import quotation_cache_key, export_to_csv_cached, export_to_pdf_cached
 from components.letter_preview import update_3d_preview
 
+# Material options with their rates
+MATERIAL_OPTIONS = {
+    "Wood": {"rate": 0.030},
+    "Acrylic": {"rate": 0.0375},
+    "Metal": {"rate": 0.045},
+    "Foam": {"rate": 0.020}
+}
+
+# Color options with their hex values
+COLOR_OPTIONS = {
+    "Blue": "#2b5876",
+    "Red": "#b22222",
+    "Green": "#228b22",
+    "Black": "#000000",
+    "White": "#ffffff",
+    "Gold": "#ffd700",
+    "Silver": "#c0c0c0",
+    "Bronze": "#cd7f32",
+    "Purple": "#800080",
+    "Orange": "#ffa500"
+}
+
+FINISH_OPTIONS = ("Standard", "Painted", "High Gloss", "Matte")
+
+# Selectbox option sequences and their value -> position lookups, built once per process
+_MATERIAL_KEYS = tuple(MATERIAL_OPTIONS)
+_COLOR_KEYS = tuple(COLOR_OPTIONS)
+_MATERIAL_IDX = {key: i for i, key in enumerate(_MATERIAL_KEYS)}
+_COLOR_IDX = {key: i for i, key in enumerate(_COLOR_KEYS)}
+_FINISH_IDX = {key: i for i, key in enumerate(FINISH_OPTIONS)}
+
+# Color swatch shown under the color selectbox
+_SWATCH_TMPL = (
+    '<div style="background-color:{};width:30px;height:30px;'
+    'border-radius:5px;border:1px solid #ddd;margin-top:5px;"></div>'
+)
+
+# Message asking the 3D viewer iframe to reset its camera
+_RESET_VIEW_JS = (
+    "<script>const iframe=document.querySelector('iframe');"
+    "if(iframe){iframe.contentWindow.postMessage({type:'reset_view'},'*');}</script>"
+)
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _cached_costs(rate: float, height: float, width: float, depth: float, quantity: int,
+                  finish: str, led_lighting: bool, mounting_hardware: bool, installation: bool) -> Dict[str, float]:
+    """calculate_costs memoized on its scalar inputs, so reruns with unchanged options reuse the result."""
+    return calculate_costs({"rate": rate}, height, width, depth, quantity, finish,
+                           led_lighting, mounting_hardware, installation)
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _cached_bulk_discount(subtotal: float, quantity: int) -> Dict[str, Union[float, int]]:
+    """calculate_bulk_discount memoized on its inputs."""
+    return calculate_bulk_discount(subtotal, quantity)
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _cached_delivery_time(quantity: int, volume: float, led_lighting: bool, installation: bool) -> int:
+    """calculate_delivery_time memoized on its inputs."""
+    return calculate_delivery_time(quantity, volume, led_lighting, installation)
+
+@functools.lru_cache(maxsize=128)
+def _validate(height: float, width: float, depth: float, letters: str) -> bool:
+    """validate_inputs memoized on its arguments; the live estimate and submit paths share the result."""
+    return validate_inputs(height, width, depth, letters)
+
+def _update_properties(new_props: Dict[str, Any]) -> None:
+    """Merge new_props into the session's letter_properties if any value differs."""
+    props = st.session_state.letter_properties
+    if any(props.get(key) != value for key, value in new_props.items()):
+        props.update(new_props)
+
+def _update_preview_if_changed(slot: str, letters: str, height: float, width: float, depth: float,
+                               font: str, color_map: Dict[int, str]) -> None:
+    """Call update_3d_preview only when its inputs differ from the last call made from this slot."""
+    props = st.session_state.letter_properties
+    signature = (
+        letters, height, width, depth, font, tuple(color_map.items()),
+        props.get("material"), props.get("finish"), props.get("led_lighting"), props.get("color_hex")
+    )
+    sig_key = f"_preview_sig_{slot}"
+    if st.session_state.get(sig_key) == signature:
+        return
+    st.session_state[sig_key] = signature
+    update_3d_preview(letters, height, width, depth, font, color_map)
+
 def render_quotation_form() -> None:
     """Render the quotation form with a two-step process: first letters, then main options."""
 
-    # Material options with their rates
-    material_options = {
-        "Wood": {"rate": 0.030},
-        "Acrylic": {"rate": 0.0375},
-        "Metal": {"rate": 0.045},
-        "Foam": {"rate": 0.020}
-    }
-
-    # Color options with their hex values
-    color_options = {
-        "Blue": "#2b5876",
-        "Red": "#b22222",
-        "Green": "#228b22",
-        "Black": "#000000",
-        "White": "#ffffff",
-        "Gold": "#ffd700",
-        "Silver": "#c0c0c0",
-        "Bronze": "#cd7f32",
-        "Purple": "#800080",
-        "Orange": "#ffa500"
-    }
-
     # # Check if we need to reuse a saved quotation
     # duplicate_mode = st.session_state.get("duplicate_quotation_index") is not None
 
@@ -74,8 +137,9 @@ def render_quotation_form() -> None:
         preview_depth = st.session_state.letter_properties.get("depth", 2.0)
         preview_font = "helvetiker_bold"  # Use a default font
         # Use default color blue for all letters in this step
-        preview_letter_color_map = {i: "#2b5876" for i in range(len(preview_letters.strip()))}
-        update_3d_preview(
+        preview_letter_color_map = {i: "#2b5876" for i in range(num_letters)}
+        _update_preview_if_changed(
+            "step1",
             preview_letters,
             preview_height,
             preview_width,
@@ -101,13 +165,13 @@ def render_quotation_form() -> None:
                 st.subheader("Step 2: Choose Options for Your Letters")
 
                 letters = st.session_state.letter_properties["letters"]
-                num_letters = len(letters.strip())
+                stripped_letters = letters.strip()
+                num_letters = len(stripped_letters)
 
                 material = st.selectbox(
                     "Material Type",
-                    options=list(material_options.keys()),
-                    index=list(material_options.keys()).index(st.session_state.letter_properties.get("material", "Acrylic"))
-                        if st.session_state.letter_properties.get("material", "Acrylic") in material_options else 0,
+                    options=_MATERIAL_KEYS,
+                    index=_MATERIAL_IDX.get(st.session_state.letter_properties.get("material", "Acrylic"), 0),
                     key="input_material"
                 )
 
@@ -158,12 +222,10 @@ def render_quotation_form() -> None:
                     )
 
                 with col_f:
-                    finish_options = ["Standard", "Painted", "High Gloss", "Matte"]
                     finish = st.selectbox(
                         "Finish Type",
-                        options=finish_options,
-                        index=finish_options.index(st.session_state.letter_properties.get("finish", "Standard"))
-                            if st.session_state.letter_properties.get("finish", "Standard") in finish_options else 0,
+                        options=FINISH_OPTIONS,
+                        index=_FINISH_IDX.get(st.session_state.letter_properties.get("finish", "Standard"), 0),
                         key="input_finish"
                     )
 
@@ -177,36 +239,31 @@ def render_quotation_form() -> None:
                 default_color = st.session_state.letter_properties.get("color", "Blue")
                 selected_color = st.selectbox(
                     "Color",
-                    options=list(color_options.keys()),
-                    index=list(color_options.keys()).index(default_color)
-                        if default_color in color_options else 0,
+                    options=_COLOR_KEYS,
+                    index=_COLOR_IDX.get(default_color, 0),
                     key="input_color_word"
                 )
 
-                # Store color info in session state
-                st.session_state.letter_properties["color"] = selected_color
-                st.session_state.letter_properties["color_hex"] = color_options[selected_color]
-                st.session_state.letter_properties["multi_color"] = False
-                # For compatibility, fill letter_colors with all letters having the same color
-                letter_colors = {}
-                for i, letter in enumerate(letters.strip()):
-                    letter_colors[str(i)] = {
-                        "name": selected_color,
-                        "hex": color_options[selected_color],
-                        "char": letter
-                    }
-                st.session_state.letter_properties["letter_colors"] = letter_colors
+                selected_hex = COLOR_OPTIONS[selected_color]
+
+                # For compatibility, fill letter_colors with all letters having the same color;
+                # the 3D preview color map is built here once and reused below
+                letter_colors = {
+                    str(i): {"name": selected_color, "hex": selected_hex, "char": letter}
+                    for i, letter in enumerate(stripped_letters)
+                }
+                letter_color_map = dict.fromkeys(range(num_letters), selected_hex)
+
+                # Store color info in session state, in one update and only when it changed
+                _update_properties({
+                    "color": selected_color,
+                    "color_hex": selected_hex,
+                    "multi_color": False,
+                    "letter_colors": letter_colors
+                })
 
                 # Show color preview
-                st.markdown(f"""
-                <div style="background-color: {color_options[selected_color]};
-                            width: 30px;
-                            height: 30px;
-                            border-radius: 5px;
-                            border: 1px solid #ddd;
-                            margin-top: 5px;">
-                </div>
-                """, unsafe_allow_html=True)
+                st.markdown(_SWATCH_TMPL.format(selected_hex), unsafe_allow_html=True)
 
                 st.subheader("Additional Options")
                 col1, col2 = st.columns(2)
@@ -240,55 +297,37 @@ def render_quotation_form() -> None:
                 if installation:
                     st.info("Our team will professionally install your 3D letters")
 
-                if letters.strip() and validate_inputs(height, width, depth, letters):
-                    current_props = {
-                        "material": material,
-                        "height": height,
-                        "width": width,
-                        "depth": depth,
-                        "quantity": quantity,
-                        "num_letters": num_letters,
-                        "finish": finish,
-                        "led_lighting": led_lighting,
-                        "mounting_hardware": mounting_hardware,
-                        "installation": installation
-                    }
-
-                    estimate = calculate_costs(
-                        material_options[material],
-                        height, width, depth,
-                        quantity * num_letters,
-                        finish,
-                        led_lighting,
-                        mounting_hardware,
-                        installation
-                    )
+                if stripped_letters and _validate(height, width, depth, letters):
+                    # Reuse the formatted estimate while the inputs are unchanged
+                    estimate_sig = (material, height, width, depth, quantity, num_letters,
+                                    finish, led_lighting, mounting_hardware, installation)
+                    if st.session_state.get("_estimate_sig") != estimate_sig:
+                        estimate = _cached_costs(
+                            MATERIAL_OPTIONS[material]["rate"],
+                            height, width, depth,
+                            quantity * num_letters,
+                            finish,
+                            led_lighting,
+                            mounting_hardware,
+                            installation
+                        )
+                        st.session_state["_estimate_sig"] = estimate_sig
+                        st.session_state["_estimate_val"] = format_currency(estimate["total"])
 
                     st.metric(
                         "Estimated Total",
-                        format_currency(estimate["total"]),
+                        st.session_state["_estimate_val"],
                         delta=None
                     )
 
-                # --- 3D preview letter color map for this step ---
-                letter_color_map = {}
-                for i, letter in enumerate(letters.strip()):
-                    letter_color_map[i] = color_options[selected_color]
-
                 col_btn1, col_btn2 = st.columns(2)
                 with col_btn1:
+                    # The preview column refreshes itself when the inputs change,
+                    # so calculating does not need its own preview update
                     submitted = st.form_submit_button(
                         "Calculate Quote",
                         use_container_width=True,
-                        type="primary",
-                        on_click=lambda: update_3d_preview(
-                            st.session_state.letter_properties["letters"],
-                            height,
-                            width,
-                            depth,
-                            "helvetiker_bold",  # Use default font
-                            letter_color_map
-                        )
+                        type="primary"
                     )
 
                 with col_btn2:
@@ -308,7 +347,7 @@ def render_quotation_form() -> None:
                 )
 
             if submitted:
-                st.session_state.letter_properties.update({
+                _update_properties({
                     "material": material,
                     "height": height,
                     "width": width,
@@ -320,10 +359,10 @@ def render_quotation_form() -> None:
                     "installation": installation
                 })
 
-                if validate_inputs(height, width, depth, letters):
+                if _validate(height, width, depth, letters):
                     with st.spinner("Calculating quote..."):
-                        costs = calculate_costs(
-                            material_options[material],
+                        costs = _cached_costs(
+                            MATERIAL_OPTIONS[material]["rate"],
                             height, width, depth,
                             quantity * num_letters,
                             finish,
@@ -333,12 +372,12 @@ def render_quotation_form() -> None:
                         )
 
                         if quantity * num_letters >= 50:
-                            discount_info = calculate_bulk_discount(costs["subtotal"], quantity * num_letters)
+                            discount_info = _cached_bulk_discount(costs["subtotal"], quantity * num_letters)
                             costs.update(discount_info)
 
                         volume = height * width * depth
 
-                        delivery_days = calculate_delivery_time(
+                        delivery_days = _cached_delivery_time(
                             quantity * num_letters,
                             volume,
                             led_lighting,
@@ -428,22 +467,19 @@ def render_quotation_form() -> None:
                 "finish": finish
             }
 
-            # All letters have the same color
-            letter_color_map = {}
-            for i, letter in enumerate(letters.strip()):
-                letter_color_map[i] = color_options[selected_color]
-
+            # All letters have the same color (letter_color_map is built in the form above)
             if letter_color_map:
                 preview_props["letterColors"] = letter_color_map
                 preview_props["multiColor"] = False
-                preview_props["color"] = color_options[selected_color]
+                preview_props["color"] = COLOR_OPTIONS[selected_color]
             else:
                 preview_props["letterColors"] = {}
                 preview_props["multiColor"] = False
                 preview_props["color"] = "#2b5876"
 
-            # --- Always update the 3D preview with the default font ---
-            update_3d_preview(
+            # --- Update the 3D preview with the default font when anything changed ---
+            _update_preview_if_changed(
+                "step2",
                 letters,
                 height,
                 width,
@@ -455,16 +491,7 @@ def render_quotation_form() -> None:
             st.caption("Rotate with mouse drag. Zoom with scroll wheel.")
 
             if st.button("Reset View", key="reset_preview"):
-                st.markdown("""
-                <script>
-                    const iframe = document.querySelector('iframe');
-                    if (iframe) {
-                        iframe.contentWindow.postMessage({
-                            type: 'reset_view'
-                        }, '*');
-                    }
-                </script>
-                """, unsafe_allow_html=True)
+                st.markdown(_RESET_VIEW_JS, unsafe_allow_html=True)
     else:
         st.info("Please enter your letters and then click 'Next: Choose Options' to continue.")
 
@@ -482,35 +509,34 @@ def display_quotation(quotation: Dict[str, Any]) -> None:
 
         with col1:
             st.markdown("### Specifications")
-            specs_data = [
-                ["Material", quotation["material"]],
-                ["Dimensions", quotation["dimensions"]],
-                ["Finish", quotation["finish"]],
-                ["Quantity", f"{quotation['quantity']} sets ({quotation['total_letters']} letters)"]
-            ]
-
             if quotation.get("multi_color", False):
                 color_info = "Multiple colors"
             else:
                 color_info = quotation.get("color", "Not specified")
 
-            specs_data.append(["Color", color_info])
-
-            specs_df = pd.DataFrame(specs_data, columns=["Specification", "Value"])
-            st.dataframe(specs_df, hide_index=True, use_container_width=True)
+            # Columns as plain lists; no intermediate DataFrame
+            st.dataframe({
+                "Specification": ["Material", "Dimensions", "Finish", "Quantity", "Color"],
+                "Value": [
+                    quotation["material"],
+                    quotation["dimensions"],
+                    quotation["finish"],
+                    f"{quotation['quantity']} sets ({quotation['total_letters']} letters)",
+                    color_info
+                ]
+            }, hide_index=True, use_container_width=True)
 
         with col2:
             st.markdown("### Options & Delivery")
 
-            options_list = []
-            for option, enabled in quotation["options"].items():
-                status = "✅ Included" if enabled else "❌ Not included"
-                options_list.append([option, status])
-
-            options_list.append(["Estimated Delivery", f"{quotation['estimated_delivery_days']} business days"])
-
-            options_df = pd.DataFrame(options_list, columns=["Option", "Status"])
-            st.dataframe(options_df, hide_index=True, use_container_width=True)
+            options = quotation["options"]
+            st.dataframe({
+                "Option": [*options, "Estimated Delivery"],
+                "Status": [
+                    *("✅ Included" if enabled else "❌ Not included" for enabled in options.values()),
+                    f"{quotation['estimated_delivery_days']} business days"
+                ]
+            }, hide_index=True, use_container_width=True)
 
         st.markdown("### Cost Summary")
 
@@ -529,8 +555,10 @@ def display_quotation(quotation: Dict[str, Any]) -> None:
         costs_formatted["Tax (10%)"] = format_currency(costs["tax"])
         costs_formatted["Total"] = format_currency(costs["total"])
 
-        costs_df = pd.DataFrame(list(costs_formatted.items()), columns=["Item", "Amount"])
-        st.dataframe(costs_df, hide_index=True, use_container_width=True)
+        st.dataframe({
+            "Item": list(costs_formatted),
+            "Amount": list(costs_formatted.values())
+        }, hide_index=True, use_container_width=True)
 
         st.metric("Final Quote Amount", format_currency(costs["total"]))
 
@@ -542,44 +570,44 @@ def display_quotation(quotation: Dict[str, Any]) -> None:
         #     st.success(f"Quote for '{quotation['letters']}' saved successfully!")
 
     with tab_details:
-        st.markdown("### Detailed Cost Calculations")
-
         volume = quotation["volume_per_letter"]
         height, width = float(quotation["height"]), float(quotation["width"])
         area = height * width
 
-        st.markdown(f"""
-        #### Volume and Area Calculations
-        - **Volume per letter**: {volume:.2f} cubic inches
-        - **Area per letter**: {area:.2f} square inches
-        - **Total volume**: {volume * quotation['total_letters']:.2f} cubic inches
-        - **Total area**: {area * quotation['total_letters']:.2f} square inches
-        """)
+        # Collect every section and emit the whole breakdown as one markdown element
+        sections = ["### Detailed Cost Calculations"]
+
+        sections.append("\n".join([
+            "#### Volume and Area Calculations",
+            f"- **Volume per letter**: {volume:.2f} cubic inches",
+            f"- **Area per letter**: {area:.2f} square inches",
+            f"- **Total volume**: {volume * quotation['total_letters']:.2f} cubic inches",
+            f"- **Total area**: {area * quotation['total_letters']:.2f} square inches"
+        ]))
 
         material_rate = quotation["costs"]["material_cost"] / volume
-        st.markdown(f"""
-        #### Material Cost Breakdown
-        - **Material**: {quotation["material"]}
-        - **Rate**: {format_currency(material_rate)} per cubic inch
-        - **Volume per letter**: {volume:.2f} cubic inches
-        - **Cost per letter**: {format_currency(quotation["costs"]["material_cost"] / quotation['total_letters'])}
-        - **Total material cost**: {format_currency(quotation["costs"]["material_cost"])}
-        """)
+        sections.append("\n".join([
+            "#### Material Cost Breakdown",
+            f"- **Material**: {quotation['material']}",
+            f"- **Rate**: {format_currency(material_rate)} per cubic inch",
+            f"- **Volume per letter**: {volume:.2f} cubic inches",
+            f"- **Cost per letter**: {format_currency(quotation['costs']['material_cost'] / quotation['total_letters'])}",
+            f"- **Total material cost**: {format_currency(quotation['costs']['material_cost'])}"
+        ]))
 
         if quotation["costs"]["finish_cost"] > 0:
             finish_multiplier = quotation["costs"]["finish_cost"] / quotation["costs"]["material_cost"] + 1
-            st.markdown(f"""
-            #### Finish Cost Breakdown
-            - **Finish type**: {quotation["finish"]}
-            - **Price multiplier**: {finish_multiplier:.2f}x
-            - **Total finish cost**: {format_currency(quotation["costs"]["finish_cost"])}
-            """)
+            sections.append("\n".join([
+                "#### Finish Cost Breakdown",
+                f"- **Finish type**: {quotation['finish']}",
+                f"- **Price multiplier**: {finish_multiplier:.2f}x",
+                f"- **Total finish cost**: {format_currency(quotation['costs']['finish_cost'])}"
+            ]))
         else:
-            st.markdown("#### Finish: Standard (No additional cost)")
+            sections.append("#### Finish: Standard (No additional cost)")
 
         if quotation["costs"]["options_cost"] > 0:
-            st.markdown("#### Options Cost Breakdown")
-            options_breakdown = []
+            options_breakdown = ["#### Options Cost Breakdown"]
 
             if quotation["options"]["LED Lighting"]:
                 led_cost = area * 15 * 1.2 * quotation['total_letters']
@@ -593,29 +621,28 @@ def display_quotation(quotation: Dict[str, Any]) -> None:
                 installation_cost = area * 5 * quotation['total_letters']
                 options_breakdown.append(f"- **Installation**: {format_currency(installation_cost)}")
 
-            options_text = "\n".join(options_breakdown)
-            st.markdown(f"""
-            {options_text}
-            - **Total options cost**: {format_currency(quotation["costs"]["options_cost"])}
-            """)
+            options_breakdown.append(f"- **Total options cost**: {format_currency(quotation['costs']['options_cost'])}")
+            sections.append("\n".join(options_breakdown))
         else:
-            st.markdown("#### No additional options selected")
+            sections.append("#### No additional options selected")
 
         if "discount_amount" in quotation["costs"]:
-            st.markdown(f"""
-            #### Bulk Discount
-            - **Number of letters**: {quotation['total_letters']}
-            - **Discount rate**: {quotation["costs"]["discount_percentage"]}%
-            - **Discount amount**: {format_currency(quotation["costs"]["discount_amount"])}
-            - **Subtotal after discount**: {format_currency(quotation["costs"]["after_discount"])}
-            """)
-
-        st.markdown(f"""
-        #### Tax and Total
-        - **Subtotal**: {format_currency(quotation["costs"]["subtotal"])}
-        - **Tax (10%)**: {format_currency(quotation["costs"]["tax"])}
-        - **Total**: {format_currency(quotation["costs"]["total"])}
-        """)
+            sections.append("\n".join([
+                "#### Bulk Discount",
+                f"- **Number of letters**: {quotation['total_letters']}",
+                f"- **Discount rate**: {quotation['costs']['discount_percentage']}%",
+                f"- **Discount amount**: {format_currency(quotation['costs']['discount_amount'])}",
+                f"- **Subtotal after discount**: {format_currency(quotation['costs']['after_discount'])}"
+            ]))
+
+        sections.append("\n".join([
+            "#### Tax and Total",
+            f"- **Subtotal**: {format_currency(quotation['costs']['subtotal'])}",
+            f"- **Tax (10%)**: {format_currency(quotation['costs']['tax'])}",
+            f"- **Total**: {format_currency(quotation['costs']['total'])}"
+        ]))
+
+        st.markdown("\n\n".join(sections))
 
         with tab_export:
             st.markdown("### Export Options")
@@ -623,8 +650,9 @@ def display_quotation(quotation: Dict[str, Any]) -> None:
             if "current_quote" in st.session_state:
                 quotation = st.session_state.current_quote
     
-                csv_data = export_to_csv(quotation)
-                pdf_data = export_to_pdf(quotation)
+                quote_key = quotation_cache_key(quotation)
+                csv_data = export_to_csv_cached(quote_key, quotation)
+                pdf_data = export_to_pdf_cached(quote_key, quotation)
     
                 col1, col2 = st.columns(2)
     
@@ -1,72 +1,151 @@
 import streamlit as st
-import pandas as pd
 import os
 import json
-import base64
-import hashlib
-from typing import Dict, List, Optional, Tuple, Any, Union
+import copy
+import time
+import tempfile
+from typing import Dict, Optional, Any
 from datetime import datetime, timedelta
+from pathlib import Path
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
 
 # Import components
+from components.auth import hash_password, burn_verify, verify_password_cached, forget_verified, needs_rehash
 from components.letter_preview import render_3d_preview
 from components.quotation_form import render_quotation_form
-from components.quotation_display import display_quotation_details
 
 # Import utilities
-from utils.calculations import calculate_costs, calculate_delivery_time, calculate_bulk_discount
-from utils.validation import validate_inputs, sanitize_text_input
-from utils.formatting import format_currency
-from utils.export import export_to_csv, export_to_pdf
+from utils.formatting import format_currency, format_timestamp
+from utils.export import quotation_cache_key, export_to_csv_cached, export_to_pdf_cached
 
 # --- User Authentication Utilities ---
 
 USERS_FILE = os.path.join(os.path.dirname(__file__), "users.json")
 
-def hash_password(password: str) -> str:
-    """Hash a password for storing."""
-    return hashlib.sha256(password.encode()).hexdigest()
-
-def load_users() -> Dict[str, Dict[str, str]]:
-    """Load users from the users.json file."""
-    if not os.path.exists(USERS_FILE):
-        return {}
+def _write_json_atomic(path: str, data: Any) -> None:
+    """Write compact JSON to a temporary file in one call, then swap it into place."""
+    # A unique temp name per write, so concurrent writers never share a file
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(json.dumps(data, separators=(",", ":")).encode("utf-8"))
+            # Make sure the data is on disk before it replaces the old file
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+@st.cache_data(show_spinner=False)
+def _load_users_cached(mtime_ns: int) -> Dict[str, Dict[str, str]]:
+    """Parse the users.json file; cached per file modification time."""
     with open(USERS_FILE, "r") as f:
         try:
             return json.load(f)
         except Exception:
             return {}
 
-def save_users(users: Dict[str, Dict[str, str]]) -> None:
-    """Save users to the users.json file."""
-    with open(USERS_FILE, "w") as f:
-        json.dump(users, f, indent=2)
+def load_users() -> Dict[str, Dict[str, str]]:
+    """Load users from the users.json file."""
+    try:
+        return _load_users_cached(os.stat(USERS_FILE).st_mtime_ns)
+    except FileNotFoundError:
+        return {}
+
+@contextmanager
+def _users_lock():
+    """Serialize read-modify-write cycles on users.json across sessions and processes."""
+    # Lock a sidecar file: users.json itself is swapped out by os.replace
+    with open(USERS_FILE + ".lock", "a+b") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+def _store_users(users: Dict[str, Dict[str, str]]) -> None:
+    """Write users.json unconditionally and drop the parsed copies of the old contents."""
+    _write_json_atomic(USERS_FILE, users)
+    _load_users_cached.clear()
 
 def register_user(username: str, password: str) -> bool:
     """Register a new user. Returns True if successful, False if user exists."""
-    users = load_users()
-    if username in users:
+    # Cheap check first so taken names do not pay for hashing
+    if username in load_users():
         return False
-    users[username] = {
-        "password": hash_password(password)
-    }
-    save_users(users)
+    password_hash = hash_password(password)
+    with _users_lock():
+        users = load_users()
+        if username in users:
+            return False
+        users[username] = {
+            "password": password_hash
+        }
+        _store_users(users)
     return True
 
 def authenticate_user(username: str, password: str) -> bool:
     """Authenticate user credentials."""
     users = load_users()
-    if username in users and users[username]["password"] == hash_password(password):
-        return True
-    return False
+    if username not in users:
+        # Burn a verify anyway so unknown names take as long as wrong passwords
+        burn_verify(password)
+        return False
+    stored_hash = users[username]["password"]
+    if not verify_password_cached(stored_hash, password):
+        return False
+    # Upgrade legacy SHA-256 or outdated Argon2 hashes while we have the plaintext
+    if needs_rehash(stored_hash):
+        new_hash = hash_password(password)
+        with _users_lock():
+            users = load_users()
+            # Skip if the password changed in the meantime
+            if users.get(username, {}).get("password") == stored_hash:
+                users[username]["password"] = new_hash
+                _store_users(users)
+        forget_verified(stored_hash)
+    return True
 
 def change_user_password(username: str, old_password: str, new_password: str) -> bool:
     """Change the password for a user. Returns True if successful."""
     users = load_users()
-    if username in users and users[username]["password"] == hash_password(old_password):
-        users[username]["password"] = hash_password(new_password)
-        save_users(users)
+    if username not in users:
+        return False
+    old_hash = users[username]["password"]
+    if not verify_password_cached(old_hash, old_password):
+        return False
+    # Same password again: the stored hash already matches, nothing to write
+    if new_password == old_password:
         return True
-    return False
+    new_hash = hash_password(new_password)
+    with _users_lock():
+        users = load_users()
+        # Fail if another session changed the password after we verified it
+        if users.get(username, {}).get("password") != old_hash:
+            return False
+        users[username]["password"] = new_hash
+        _store_users(users)
+    # The old hash no longer authenticates anyone; drop its cached check
+    forget_verified(old_hash)
+    return True
 
 # --- Persistent Login Utilities ---
 
@@ -75,29 +154,26 @@ LOGIN_FILE = os.path.join(os.path.dirname(__file__), "login_state.json")
 def save_login_state(username: str) -> None:
     """Save the currently logged-in username to a file."""
     try:
-        with open(LOGIN_FILE, "w") as f:
-            json.dump({"username": username}, f)
+        _write_json_atomic(LOGIN_FILE, {"username": username})
     except Exception:
         pass
+    load_login_state.clear()
 
+@st.cache_data(ttl=60, show_spinner=False)
 def load_login_state() -> Optional[str]:
     """Load the currently logged-in username from a file."""
-    if not os.path.exists(LOGIN_FILE):
-        return None
     try:
-        with open(LOGIN_FILE, "r") as f:
-            data = json.load(f)
-            return data.get("username")
+        return json.loads(Path(LOGIN_FILE).read_bytes()).get("username")
     except Exception:
         return None
 
 def clear_login_state() -> None:
     """Remove the persistent login file."""
     try:
-        if os.path.exists(LOGIN_FILE):
-            os.remove(LOGIN_FILE)
+        os.remove(LOGIN_FILE)
     except Exception:
         pass
+    load_login_state.clear()
 
 def login_signup_form():
     """Streamlit login/signup form with persistent login support."""
@@ -147,18 +223,49 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+@st.cache_resource(show_spinner=False)
+def _read_css() -> str:
+    """Read the stylesheet once per process; the file does not change while the app runs."""
+    with open(r'project/app/static/css/styles.css') as f:
+        return f.read()
+
 # Load custom CSS
 def load_css() -> None:
     """Load custom CSS styles."""
     try:
-        with open(r'project/app/static/css/styles.css') as f:
-            st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
+        st.markdown(f'<style>{_read_css()}</style>', unsafe_allow_html=True)
     except FileNotFoundError:
         st.warning("Custom CSS file not found. Using default styles.")
 
+# Session defaults, copied into each new session's state
+_DEFAULTS = {
+    "username": None,
+    "quotations": [],
+    "current_quote": None,
+    "letter_properties": {
+        "letters": "ABC",
+        "height": 12.0,
+        "width": 8.0,
+        "depth": 2.0,
+        "material": "Wood",
+        "finish": "Standard",
+        "color": "Blue",
+        "quantity": 1,
+        "led_lighting": False,
+        "mounting_hardware": False,
+        "installation": False,
+        "font": "default",
+        "letter_colors": {}  # For multi-color support
+    },
+    "last_calculation_props": {}
+}
+
 # Initialize session state variables
 def init_session_state() -> None:
-    """Initialize all session state variables."""
+    """Initialize all session state variables once per session."""
+    if st.session_state.get("_initialized"):
+        return
+
     if 'authenticated' not in st.session_state:
         # Try to load persistent login
         username = load_login_state()
@@ -175,34 +282,11 @@ def init_session_state() -> None:
         else:
             st.session_state.authenticated = False
 
-    if 'username' not in st.session_state:
-        st.session_state.username = None
-
-    if 'quotations' not in st.session_state:
-        st.session_state.quotations = []
-
-    if 'current_quote' not in st.session_state:
-        st.session_state.current_quote = None
-
-    if 'letter_properties' not in st.session_state:
-        st.session_state.letter_properties = {
-            "letters": "ABC",
-            "height": 12.0,
-            "width": 8.0,
-            "depth": 2.0,
-            "material": "Wood",
-            "finish": "Standard",
-            "color": "Blue",
-            "quantity": 1,
-            "led_lighting": False,
-            "mounting_hardware": False,
-            "installation": False,
-            "font": "default",
-            "letter_colors": {}  # For multi-color support
-        }
+    for key, value in _DEFAULTS.items():
+        if key not in st.session_state:
+            st.session_state[key] = copy.deepcopy(value)
 
-    if 'last_calculation_props' not in st.session_state:
-        st.session_state.last_calculation_props = {}
+    st.session_state._initialized = True
 
 def main() -> None:
     """Main application function."""
@@ -251,58 +335,58 @@ def display_current_quotation() -> None:
         # Show spinner for loading simulation
         with st.spinner("Finalizing quotation..."):
             # Display quote details
-            st.markdown(f"""
-            ### Order Details
-            **Letters:** {quote['letters']}  
-            **Font:** {quote['font']}  
-            **Material:** {quote['material']}  
-            **Dimensions (per letter):** {quote['dimensions']}  
-            **Number of Sets:** {quote['quantity']}  
-            **Total Letters:** {quote['total_letters']}  
-            **Finish:** {quote['finish']}
-            """)
+            st.markdown("### Order Details\n" + "  \n".join([
+                f"**Letters:** {quote['letters']}",
+                f"**Font:** {quote['font']}",
+                f"**Material:** {quote['material']}",
+                f"**Dimensions (per letter):** {quote['dimensions']}",
+                f"**Number of Sets:** {quote['quantity']}",
+                f"**Total Letters:** {quote['total_letters']}",
+                f"**Finish:** {quote['finish']}"
+            ]))
 
             # Display color information
             if quote.get('multi_color', False):
-                st.markdown("### Colors")
-                for i, (letter, color) in enumerate(quote['letter_colors'].items()):
-                    st.markdown(f"- Letter '{letter}': <span style='color:{color['hex']}'>\u25A0</span> {color['name']}", unsafe_allow_html=True)
+                st.markdown("### Colors\n" + "\n".join(
+                    f"- Letter '{letter}': <span style='color:{color['hex']}'>\u25A0</span> {color['name']}"
+                    for letter, color in quote['letter_colors'].items()
+                ), unsafe_allow_html=True)
             else:
                 st.markdown(f"**Color:** <span style='color:{quote['color_hex']}'>\u25A0</span> {quote['color']}", unsafe_allow_html=True)
 
             # Display selected options
-            st.markdown("### Selected Options")
-            for option, selected in quote['options'].items():
-                st.markdown(f"- {option}: {'Yes' if selected else 'No'}")
+            st.markdown("### Selected Options\n" + "\n".join(
+                f"- {option}: {'Yes' if selected else 'No'}" for option, selected in quote['options'].items()
+            ))
 
-            # Display cost breakdown
-            st.markdown("### Cost Breakdown")
+            # Cost breakdown, discount, totals and delivery go out as one element
             costs = quote['costs']
-            st.markdown(f"""
-            Material Cost ({quote['volume_per_letter']:.1f} cubic inches/letter): {format_currency(costs['material_cost'])}  
-            Finish Cost: {format_currency(costs['finish_cost'])}  
-            Options Cost: {format_currency(costs['options_cost'])}  
-            **Subtotal:** {format_currency(costs['subtotal'])}
-            """)
+            cost_lines = [
+                f"Material Cost ({quote['volume_per_letter']:.1f} cubic inches/letter): {format_currency(costs['material_cost'])}",
+                f"Finish Cost: {format_currency(costs['finish_cost'])}",
+                f"Options Cost: {format_currency(costs['options_cost'])}",
+                f"**Subtotal:** {format_currency(costs['subtotal'])}"
+            ]
 
             # Display discount if applicable
             if costs.get('discount', 0) > 0:
-                st.markdown(f"**Bulk Discount ({costs['discount_percentage']}%):** -{format_currency(costs['discount'])}")
+                cost_lines.append(f"**Bulk Discount ({costs['discount_percentage']}%):** -{format_currency(costs['discount'])}")
 
-            # Display final costs
-            st.markdown(f"""
-            **Tax (10%):** {format_currency(costs['tax'])}  
-            **Final Total:** {format_currency(costs['total'])}
-            """)
+            cost_lines.append(f"**Tax (10%):** {format_currency(costs['tax'])}")
+            cost_lines.append(f"**Final Total:** {format_currency(costs['total'])}")
 
             # Display estimated delivery time
             delivery_days = quote.get('estimated_delivery_days', 7)
             delivery_date = datetime.now() + timedelta(days=delivery_days)
-            st.markdown(f"""
-            ### Estimated Delivery
-            **Production Time:** {delivery_days} business days  
-            **Estimated Completion:** {delivery_date.strftime('%B %d, %Y')}
-            """)
+            delivery_lines = [
+                f"**Production Time:** {delivery_days} business days",
+                f"**Estimated Completion:** {delivery_date.strftime('%B %d, %Y')}"
+            ]
+
+            st.markdown(
+                "### Cost Breakdown\n" + "  \n".join(cost_lines)
+                + "\n\n### Estimated Delivery\n" + "  \n".join(delivery_lines)
+            )
 
         # Action buttons
         col1, col2 = st.columns(2)
@@ -330,16 +414,15 @@ def display_current_quotation() -> None:
 
             if st.button("Export", key="export_btn", use_container_width=True):
                 with st.spinner("Preparing export..."):
+                    # Cached per quote content, so repeated exports are a lookup
+                    quote_key = quotation_cache_key(quote)
                     if export_options == "CSV":
-                        export_data = export_to_csv(quote)
+                        export_data = export_to_csv_cached(quote_key, quote)
                         mime = "text/csv"
                         ext = "csv"
                     else:  # PDF
-                        export_data = export_to_pdf(quote)
-                        # If export_to_pdf returns a file path, read as bytes
-                        if isinstance(export_data, str):
-                            with open(export_data, "rb") as f:
-                                export_data = f.read()
+                        # Built in memory; always bytes, including the text fallback
+                        export_data = export_to_pdf_cached(quote_key, quote)
                         mime = "application/pdf"
                         ext = "pdf"
                     st.session_state.export_data = export_data
@@ -348,7 +431,7 @@ def display_current_quotation() -> None:
                     st.session_state.show_download = True
 
             if st.session_state.get("show_download", False) and st.session_state.get("export_data", None) is not None:
-                file_name = f"quotation_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{st.session_state.export_ext}"
+                file_name = f"quotation_{format_timestamp(int(time.time()), '%Y%m%d_%H%M%S')}.{st.session_state.export_ext}"
                 st.download_button(
                     label=f"Download {st.session_state.export_ext.upper()}",
                     data=st.session_state.export_data,
@@ -399,6 +482,9 @@ def render_settings() -> None:
 
     # Log out button
     if st.button("Log Out"):
+        stored_hash = load_users().get(st.session_state.username, {}).get("password")
+        if stored_hash:
+            forget_verified(stored_hash)
         st.session_state.authenticated = False
         st.session_state.username = None
         clear_login_state()
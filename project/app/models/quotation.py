@@ -1,8 +1,21 @@
+import sys
 from typing import Dict, List, Optional, Union, Any
 from dataclasses import dataclass, field
+from enum import IntFlag
 from datetime import datetime, timedelta
+from bisect import bisect_left
 
-@dataclass
+# Extra production days by number of sets (upper bounds inclusive)
+_QUANTITY_BANDS = (5, 10)
+_QUANTITY_EXTRA_DAYS = (0, 1, 2)
+
+# Bulk discount tiers, best first: (min sets, min total letters, discount %)
+_BULK = ((10, 100, 10), (5, 50, 5))
+
+# Slotted dataclasses (no per-instance __dict__) where supported (Python 3.10+)
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_SLOTS)
 class QuotationCosts:
     """Data class representing cost breakdown for a quotation."""
     material_cost: float
@@ -14,20 +27,36 @@ class QuotationCosts:
     discount: float = 0.0
     discount_percentage: int = 0
 
-@dataclass
+class Opt(IntFlag):
+    """Bit flags for the optional add-ons of a quotation."""
+    LED = 1
+    MOUNT = 2
+    INSTALL = 4
+
+@dataclass(**_SLOTS)
 class QuotationOptions:
-    """Data class representing optional add-ons for a quotation."""
-    led_lighting: bool = False
-    mounting_hardware: bool = False
-    installation: bool = False
+    """Data class representing optional add-ons for a quotation, packed into one flag set."""
+    flags: Opt = Opt(0)
+    
+    @property
+    def led_lighting(self) -> bool:
+        return bool(self.flags & Opt.LED)
+    
+    @property
+    def mounting_hardware(self) -> bool:
+        return bool(self.flags & Opt.MOUNT)
+    
+    @property
+    def installation(self) -> bool:
+        return bool(self.flags & Opt.INSTALL)
 
-@dataclass
+@dataclass(**_SLOTS)
 class ColorInfo:
     """Data class representing color information."""
     name: str
     hex: str
 
-@dataclass
+@dataclass(**_SLOTS)
 class Quotation:
     """Data class representing a complete quotation."""
     # Basic information
@@ -78,11 +107,14 @@ class Quotation:
         
         # Extract options data
         options_data = data.get('options', {})
-        options = QuotationOptions(
-            led_lighting=options_data.get('LED Lighting', False),
-            mounting_hardware=options_data.get('Mounting Hardware', False),
-            installation=options_data.get('Installation', False)
-        )
+        flags = Opt(0)
+        if options_data.get('LED Lighting', False):
+            flags |= Opt.LED
+        if options_data.get('Mounting Hardware', False):
+            flags |= Opt.MOUNT
+        if options_data.get('Installation', False):
+            flags |= Opt.INSTALL
+        options = QuotationOptions(flags=flags)
         
         # Process color information
         multi_color = data.get('multi_color', False)
@@ -164,18 +196,13 @@ class Quotation:
         Returns:
             int: Estimated delivery days
         """
-        base_days = 5  # Base production time
-        
-        # Add days based on quantity
-        if self.quantity > 10:
-            base_days += 2
-        elif self.quantity > 5:
-            base_days += 1
+        # Base production time plus extra days based on quantity
+        base_days = 5 + _QUANTITY_EXTRA_DAYS[bisect_left(_QUANTITY_BANDS, self.quantity)]
             
         # Add days for special options
-        if self.options.led_lighting:
+        if self.options.flags & Opt.LED:
             base_days += 2
-        if self.options.installation:
+        if self.options.flags & Opt.INSTALL:
             base_days += 1
             
         # Add days for multi-color configuration
@@ -186,21 +213,17 @@ class Quotation:
 
     def apply_bulk_discount(self) -> None:
         """Apply bulk discount based on order quantity and update costs."""
-        discount_percentage = 0
+        # Find the first tier met by either the number of sets or total letters
+        for min_sets, min_letters, discount_percentage in _BULK:
+            if self.quantity >= min_sets or self.total_letters >= min_letters:
+                break
+        else:
+            return
         
-        # Calculate discount percentage based on quantity and total letters
-        if self.quantity >= 10 or self.total_letters >= 100:
-            discount_percentage = 10
-        elif self.quantity >= 5 or self.total_letters >= 50:
-            discount_percentage = 5
-            
-        # Apply discount
-        if discount_percentage > 0:
-            discount_amount = self.costs.subtotal * (discount_percentage / 100)
-            self.costs.discount = discount_amount
-            self.costs.discount_percentage = discount_percentage
-            
-            # Recalculate total
-            discounted_subtotal = self.costs.subtotal - discount_amount
-            self.costs.tax = discounted_subtotal * 0.1
-            self.costs.total = discounted_subtotal + self.costs.tax
\ No newline at end of file
+        # Apply discount, then 10% tax on the discounted subtotal
+        subtotal = self.costs.subtotal
+        factor = 1.0 - discount_percentage / 100
+        self.costs.discount = subtotal * (discount_percentage / 100)
+        self.costs.discount_percentage = discount_percentage
+        self.costs.tax = subtotal * factor * 0.1
+        self.costs.total = subtotal * factor * 1.1
\ No newline at end of file
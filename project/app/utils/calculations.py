@@ -1,5 +1,26 @@
+from bisect import bisect_left, bisect_right
 from typing import Dict, Any, Tuple, Union
 
+# Price multipliers applied to the material cost for each finish type
+_FINISH_MULT = {
+    "Standard": 1.0,
+    "Painted": 1.25,
+    "High Gloss": 1.35,
+    "Matte": 1.20
+}
+
+# Bulk discount tiers: letters needed (ascending) and the discount percentage
+# from that count up
+_TIER_QTYS = (0, 100, 250, 500, 1000)
+_TIER_PCTS = (0, 5, 10, 15, 20)
+
+# Delivery bands: base production days by total letters (upper bounds inclusive)
+# and extra days for large letter volumes (cubic inches, upper bounds inclusive)
+_QTY_BANDS = (5, 20, 50, 100)
+_QTY_DAYS = (3, 5, 7, 10, 14)
+_VOL_BANDS = (200, 500)
+_VOL_EXTRA = (0, 1, 2)
+
 def calculate_costs(material_info: Dict[str, float], height: float, width: float, 
                    depth: float, quantity: int, finish: str, led_lighting: bool, 
                    mounting_hardware: bool, installation: bool) -> Dict[str, float]:
@@ -24,50 +45,34 @@ def calculate_costs(material_info: Dict[str, float], height: float, width: float
     volume = height * width * depth
     area = height * width
     
-    # Calculate material cost based on volume and material rate
+    # Material cost per letter, and the finish surcharge on top of it
+    # (unknown finishes are priced as Standard)
     material_cost = volume * material_info["rate"]
-    
-    # Calculate finish costs
-    finish_multipliers = {
-        "Standard": 1.0,
-        "Painted": 1.25,
-        "High Gloss": 1.35,
-        "Matte": 1.20
-    }
-    
-    # Use default multiplier if finish type is not in the dictionary
-    finish_multiplier = finish_multipliers.get(finish, 1.0)
-    finish_cost = material_cost * (finish_multiplier - 1)
-    
-    # Calculate additional options
-    options_cost = 0
-    if led_lighting:
-        options_cost += area * 15 * 1.2  # $15 per square inch for LED + 20% additional charge
-    
-    if mounting_hardware:
-        options_cost += volume * 2  # $2 per cubic inch for hardware
-    
-    if installation:
-        options_cost += area * 5  # $5 per square inch for installation
-    
-    # Calculate subtotal (per letter * quantity)
-    per_letter_cost = material_cost + finish_cost
+    finish_cost = material_cost * (_FINISH_MULT.get(finish, 1.0) - 1.0)
+    
+    # Additional options per letter:
+    # LED $15 per square inch + 20% additional charge (= $18), hardware $2 per
+    # cubic inch, installation $5 per square inch
+    options_cost = ((area * 18.0 if led_lighting else 0.0)
+                    + (volume * 2.0 if mounting_hardware else 0.0)
+                    + (area * 5.0 if installation else 0.0))
+    
+    # Scale per-letter costs by quantity once
+    material_total = material_cost * quantity
+    finish_total = finish_cost * quantity
     options_total = options_cost * quantity
-    subtotal = (per_letter_cost * quantity) + options_total
+    subtotal = material_total + finish_total + options_total
     
     # Calculate tax (10%)
     tax = subtotal * 0.1
     
-    # Calculate total
-    total = subtotal + tax
-    
     return {
-        "material_cost": material_cost * quantity,
-        "finish_cost": finish_cost * quantity,
+        "material_cost": material_total,
+        "finish_cost": finish_total,
         "options_cost": options_total,
         "subtotal": subtotal,
         "tax": tax,
-        "total": total
+        "total": subtotal + tax
     }
 
 def calculate_bulk_discount(subtotal: float, quantity: int) -> Dict[str, Union[float, int]]:
@@ -81,19 +86,9 @@ def calculate_bulk_discount(subtotal: float, quantity: int) -> Dict[str, Union[f
     Returns:
         Dictionary with discount information
     """
-    # Define discount tiers
-    discount_tiers = [
-        (100, 5),   # 5% discount for 100+ letters
-        (250, 10),  # 10% discount for 250+ letters
-        (500, 15),  # 15% discount for 500+ letters
-        (1000, 20)  # 20% discount for 1000+ letters
-    ]
-    
-    # Find the applicable discount percentage
-    discount_percentage = 0
-    for tier_quantity, tier_discount in discount_tiers:
-        if quantity >= tier_quantity:
-            discount_percentage = tier_discount
+    # Find the applicable discount percentage: the highest tier whose
+    # threshold the quantity reaches (quantities below 0 get no discount)
+    discount_percentage = _TIER_PCTS[max(bisect_right(_TIER_QTYS, quantity) - 1, 0)]
     
     # Calculate discount amount
     discount = subtotal * (discount_percentage / 100) if discount_percentage > 0 else 0
@@ -119,34 +114,9 @@ def calculate_delivery_time(quantity: int, volume: float,
     Returns:
         Estimated delivery time in business days
     """
-    # Base production time based on quantity
-    if quantity <= 5:
-        base_days = 3
-    elif quantity <= 20:
-        base_days = 5
-    elif quantity <= 50:
-        base_days = 7
-    elif quantity <= 100:
-        base_days = 10
-    else:
-        base_days = 14
-    
-    # Additional time based on complexity
-    complexity_days = 0
-    
-    # Large volume letters take more time
-    if volume > 500:
-        complexity_days += 2
-    elif volume > 200:
-        complexity_days += 1
-    
-    # LED lighting adds time
-    if led_lighting:
-        complexity_days += 2
-    
-    # Installation service adds time for scheduling
-    if installation:
-        complexity_days += 1
-    
-    # Return total estimated days
-    return base_days + complexity_days
\ No newline at end of file
+    # Base production time based on quantity, plus time for large volume letters,
+    # LED lighting (2 days) and installation scheduling (1 day)
+    return (_QTY_DAYS[bisect_left(_QTY_BANDS, quantity)]
+            + _VOL_EXTRA[bisect_left(_VOL_BANDS, volume)]
+            + (2 if led_lighting else 0)
+            + (1 if installation else 0))
\ No newline at end of file
@@ -1,12 +1,65 @@
-import pandas as pd
-import io
+import csv
+import os
+import functools
+from io import BytesIO, StringIO
+from types import SimpleNamespace
 from typing import Dict, Any, Union, List
 import json
-from datetime import datetime, timedelta
+import hashlib
+from datetime import date, datetime, timedelta
 import streamlit as st
 
+# Company logo bundled with the app, resolved relative to this module
+LOGO_PATH = os.path.join(os.path.dirname(__file__), "..", "static", "images", "original_logo.png")
 
-def export_to_csv(quotation: Dict[str, Any]) -> str:
+
+@st.cache_resource(show_spinner=False)
+def _load_logo_bytes() -> bytes:
+    """
+    Read the bundled company logo once per process.
+    
+    Returns:
+        PNG data as bytes
+    """
+    with open(LOGO_PATH, "rb") as f:
+        return f.read()
+
+
+@functools.lru_cache(maxsize=None)
+def _load_reportlab() -> SimpleNamespace:
+    """
+    Import and configure ReportLab on first use, then reuse the result.
+    
+    The import is deferred so app start-up does not pay for it, and the
+    process-wide settings are applied exactly once: attribute type checking
+    on graphics shapes is switched off unless DEBUG_PDF is set.
+    
+    Returns:
+        Namespace holding the ReportLab names used to build quotations
+        
+    Raises:
+        ImportError: If ReportLab is not installed (not cached, so a later
+            install is picked up)
+    """
+    from reportlab import rl_config
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+
+    if not os.environ.get("DEBUG_PDF"):
+        rl_config.shapeChecking = 0
+
+    return SimpleNamespace(
+        colors=colors, letter=letter, SimpleDocTemplate=SimpleDocTemplate,
+        Paragraph=Paragraph, Spacer=Spacer, Table=Table, TableStyle=TableStyle,
+        Image=Image, getSampleStyleSheet=getSampleStyleSheet,
+        ParagraphStyle=ParagraphStyle, inch=inch
+    )
+
+
+def export_to_csv(quotation: Dict[str, Any]) -> bytes:
     """
     Export quotation data to CSV format with improved error handling.
     
@@ -14,7 +67,7 @@ def export_to_csv(quotation: Dict[str, Any]) -> str:
         quotation: Quotation data dictionary
         
     Returns:
-        CSV data as string
+        CSV data as UTF-8 bytes
     """
     try:
         # Use safe string conversion for all values
@@ -58,21 +111,50 @@ def export_to_csv(quotation: Dict[str, Any]) -> str:
             flat_data["Discount Percentage"] = f"{discount_percentage}%"
             flat_data["Discount Amount"] = f"{discount_amount:.2f}"
         
-        try:
-            # Try pandas DataFrame approach
-            df = pd.DataFrame([flat_data])
-            return df.to_csv(index=False)
-        except Exception as e:
-            st.warning(f"Falling back to manual CSV generation: {e}")
-            # Fallback to manual CSV creation if pandas fails
-            csv_rows = [",".join(flat_data.keys())]
-            csv_rows.append(",".join([f'"{str(v)}"' for v in flat_data.values()]))
-            return "\n".join(csv_rows)
+        # One header row and one value row; the csv module handles quoting
+        buffer = StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(flat_data.keys())
+        writer.writerow(flat_data.values())
+        return buffer.getvalue().encode("utf-8")
             
     except Exception as e:
         st.error(f"Error exporting to CSV: {e}")
         # Return a minimal CSV with error information
-        return "Error,Message\nExport failed,Please try again"
+        return b"Error,Message\nExport failed,Please try again"
+
+
+def quotation_cache_key(quotation: Dict[str, Any]) -> str:
+    """
+    Build a cache key from the full contents of a quotation and today's date.
+    
+    The exports print the current date and a completion date counted from it,
+    so a cached document must not outlive the day it was generated.
+    
+    Args:
+        quotation: Quotation data dictionary
+        
+    Returns:
+        SHA-256 hex digest of the quotation's sorted JSON representation
+        and the ISO date
+    """
+    canonical = json.dumps(quotation, sort_keys=True, default=str)
+    return hashlib.sha256(f"{date.today().isoformat()}|{canonical}".encode("utf-8")).hexdigest()
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def export_to_csv_cached(quote_key: str, _quotation: Dict[str, Any]) -> bytes:
+    """
+    Cached variant of export_to_csv, reused across reruns for an unchanged quote.
+    
+    Args:
+        quote_key: Key from quotation_cache_key
+        _quotation: Quotation data dictionary (not hashed by Streamlit)
+        
+    Returns:
+        CSV data as UTF-8 bytes
+    """
+    return export_to_csv(_quotation)
 
 
 def export_to_pdf(quotation: Dict[str, Any]) -> bytes:
@@ -87,14 +169,12 @@ def export_to_pdf(quotation: Dict[str, Any]) -> bytes:
         PDF data as bytes
     """
     try:
-        # Try using ReportLab
-        from reportlab.lib import colors
-        from reportlab.lib.pagesizes import letter
-        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image, Table as PlatypusTable
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.lib.units import inch
-        from io import BytesIO
-        import os
+        # Try using ReportLab; imported once per process on first use
+        rl = _load_reportlab()
+        colors, letter, inch = rl.colors, rl.letter, rl.inch
+        SimpleDocTemplate, Paragraph, Spacer, Image = rl.SimpleDocTemplate, rl.Paragraph, rl.Spacer, rl.Image
+        TableStyle, PlatypusTable = rl.TableStyle, rl.Table
+        getSampleStyleSheet, ParagraphStyle = rl.getSampleStyleSheet, rl.ParagraphStyle
 
         # Ensure we have valid data throughout
         costs = quotation.get('costs', {})
@@ -106,7 +186,8 @@ def export_to_pdf(quotation: Dict[str, Any]) -> bytes:
         # Set up the document with letter size paper
         doc = SimpleDocTemplate(buffer, pagesize=letter, 
                                rightMargin=72, leftMargin=72,
-                               topMargin=72, bottomMargin=72)
+                               topMargin=72, bottomMargin=72,
+                               pageCompression=1)
         
         # Container for elements to build the PDF
         elements = []
@@ -117,8 +198,16 @@ def export_to_pdf(quotation: Dict[str, Any]) -> bytes:
         subtitle_style = styles['Heading2']
         normal_style = styles['Normal']
 
+        # Shared grid style, built once and reused by every table in the document
+        table_style_commands = [
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+            ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('PADDING', (0, 0), (-1, -1), 6),
+        ]
+        table_style = TableStyle(table_style_commands)
+
         # Prepare logo info for later use in onFirstPage
-        logo_path = "project/app/static/images/original_logo.png"
         # Reduce logo size a bit
         logo_width_inch = 1.5  # was 2.0
         logo_height_inch = logo_width_inch * (142/400)  # keep aspect ratio
@@ -127,8 +216,9 @@ def export_to_pdf(quotation: Dict[str, Any]) -> bytes:
         elements.append(Paragraph("3D Letter Quotation", title_style))
         elements.append(Spacer(1, 0.25*inch))
         
-        # Add date
-        current_date = datetime.now().strftime('%B %d, %Y')
+        # Add date; one clock read serves both the quote date and the delivery date
+        now = datetime.now()
+        current_date = now.strftime('%B %d, %Y')
         elements.append(Paragraph(f"Date: {current_date}", normal_style))
         elements.append(Spacer(1, 0.25*inch))
         
@@ -153,12 +243,7 @@ def export_to_pdf(quotation: Dict[str, Any]) -> bytes:
         
         # Create and style the table
         info_table = PlatypusTable(info_data, colWidths=[1.5*inch, 4*inch])
-        info_table.setStyle(TableStyle([
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('PADDING', (0, 0), (-1, -1), 6),
-        ]))
+        info_table.setStyle(table_style)
         
         elements.append(info_table)
         elements.append(Spacer(1, 0.25*inch))
@@ -175,12 +260,7 @@ def export_to_pdf(quotation: Dict[str, Any]) -> bytes:
             options_data = [["No options selected", ""]]
             
         options_table = PlatypusTable(options_data, colWidths=[1.5*inch, 4*inch])
-        options_table.setStyle(TableStyle([
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('PADDING', (0, 0), (-1, -1), 6),
-        ]))
+        options_table.setStyle(table_style)
         
         elements.append(options_table)
         elements.append(Spacer(1, 0.25*inch))
@@ -217,13 +297,9 @@ def export_to_pdf(quotation: Dict[str, Any]) -> bytes:
         ])
         
         costs_table = PlatypusTable(costs_data, colWidths=[2.5*inch, 3*inch])
-        costs_table.setStyle(TableStyle([
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('PADDING', (0, 0), (-1, -1), 6),
-            ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),  # Bold font for total
-        ]))
+        costs_table.setStyle(TableStyle(
+            table_style_commands + [('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold')]  # Bold font for total
+        ))
         
         elements.append(costs_table)
         elements.append(Spacer(1, 0.25*inch))
@@ -234,7 +310,7 @@ def export_to_pdf(quotation: Dict[str, Any]) -> bytes:
             
             # Calculate delivery date
             delivery_days = quotation['estimated_delivery_days']
-            delivery_date = (datetime.now() + timedelta(days=delivery_days)).strftime("%B %d, %Y")
+            delivery_date = (now + timedelta(days=delivery_days)).strftime("%B %d, %Y")
             
             delivery_data = [
                 ["Production Time:", f"{delivery_days} business days"],
@@ -242,12 +318,7 @@ def export_to_pdf(quotation: Dict[str, Any]) -> bytes:
             ]
             
             delivery_table = PlatypusTable(delivery_data, colWidths=[1.5*inch, 4*inch])
-            delivery_table.setStyle(TableStyle([
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('PADDING', (0, 0), (-1, -1), 6),
-            ]))
+            delivery_table.setStyle(table_style)
             
             elements.append(delivery_table)
             elements.append(Spacer(1, 0.5*inch))
@@ -263,7 +334,11 @@ def export_to_pdf(quotation: Dict[str, Any]) -> bytes:
         # --- Custom onFirstPage to draw logo in the top left corner ---
         def draw_logo_on_first_page(canvas, doc):
             # Draw the logo at the top left, overlaying the content (not pushing it down)
-            if os.path.exists(logo_path):
+            try:
+                logo_bytes = _load_logo_bytes()
+            except FileNotFoundError:
+                logo_bytes = None
+            if logo_bytes is not None:
                 try:
                     # The origin (0,0) is at the bottom left, so we need to draw at the top left
                     # Letter size: 8.5 x 11 inch, margins: 1 inch (72pt)
@@ -276,12 +351,12 @@ def export_to_pdf(quotation: Dict[str, Any]) -> bytes:
                     # Original: y = page_height - (logo_height_inch * inch) - 0.25*inch
                     # Let's move it down by 0.15 inch more (total 0.4 inch from top edge)
                     y = page_height - (logo_height_inch * inch) - 0.4*inch
-                    img = Image(logo_path, width=logo_width_inch * inch, height=logo_height_inch * inch)
+                    img = Image(BytesIO(logo_bytes), width=logo_width_inch * inch, height=logo_height_inch * inch)
                     img.drawOn(canvas, x, y)
                 except Exception as img_err:
                     st.warning(f"Could not draw logo on PDF: {img_err}")
             else:
-                st.warning(f"Logo file not found at {logo_path}. Skipping logo in PDF.")
+                st.warning(f"Logo file not found at {LOGO_PATH}. Skipping logo in PDF.")
 
         # Build the PDF with the logo drawn on the first page
         doc.build(elements, onFirstPage=draw_logo_on_first_page)
@@ -303,6 +378,21 @@ def export_to_pdf(quotation: Dict[str, Any]) -> bytes:
         return _create_text_pdf_fallback(quotation)
 
 
+@st.cache_data(max_entries=64, show_spinner=False)
+def export_to_pdf_cached(quote_key: str, _quotation: Dict[str, Any]) -> bytes:
+    """
+    Cached variant of export_to_pdf, reused across reruns for an unchanged quote.
+    
+    Args:
+        quote_key: Key from quotation_cache_key
+        _quotation: Quotation data dictionary (not hashed by Streamlit)
+        
+    Returns:
+        PDF data as bytes
+    """
+    return export_to_pdf(_quotation)
+
+
 def _create_text_pdf_fallback(quotation: Dict[str, Any]) -> bytes:
     """
     Create a simple text-based fallback when PDF generation fails.
@@ -313,10 +403,9 @@ def _create_text_pdf_fallback(quotation: Dict[str, Any]) -> bytes:
     Returns:
         Text file content as bytes
     """
-    buffer = io.BytesIO()
-    
     try:
-        current_date = datetime.now().strftime('%B %d, %Y')
+        now = datetime.now()
+        current_date = now.strftime('%B %d, %Y')
         text_content = [
             "3D LETTER QUOTATION",
             "=" * 50,
@@ -379,7 +468,7 @@ def _create_text_pdf_fallback(quotation: Dict[str, Any]) -> bytes:
         
         if 'estimated_delivery_days' in quotation:
             delivery_days = quotation['estimated_delivery_days']
-            delivery_date = (datetime.now() + timedelta(days=delivery_days)).strftime("%B %d, %Y")
+            delivery_date = (now + timedelta(days=delivery_days)).strftime("%B %d, %Y")
             
             text_content.extend([
                 "DELIVERY INFORMATION:",
@@ -391,19 +480,10 @@ def _create_text_pdf_fallback(quotation: Dict[str, Any]) -> bytes:
         
         text_content.append("Thank you for your business!")
         
-        # Join the text content with line breaks
-        content = "\n".join(text_content)
-        
-        # Write to buffer
-        buffer.write(content.encode('utf-8'))
+        # Join the text content with line breaks and encode in one step
+        return "\n".join(text_content).encode('utf-8')
         
     except Exception as text_error:
         # If even the text fallback fails, provide error message
         error_message = f"Error generating document: {str(text_error)}\nPlease try again."
-        buffer.write(error_message.encode('utf-8'))
-    
-    # Get the value and close the buffer
-    value = buffer.getvalue()
-    buffer.close()
-    
-    return value
+        return error_message.encode('utf-8')
@@ -1,5 +1,8 @@
+from datetime import datetime
+from functools import lru_cache
 from typing import Union, Dict, Any
 
+@lru_cache(maxsize=4096)
 def format_currency(amount: float) -> str:
     """
     Format number as currency.
@@ -12,6 +15,23 @@ def format_currency(amount: float) -> str:
     """
     return f"${amount:,.2f}"
 
+@lru_cache(maxsize=16)
+def format_timestamp(seconds: int, fmt: str) -> str:
+    """
+    Format a whole-second Unix timestamp in local time.
+    
+    Callers pass int(time.time()), so reruns within the same second reuse
+    the formatted string instead of calling strftime again.
+    
+    Args:
+        seconds: Unix timestamp truncated to whole seconds
+        fmt: strftime format string
+        
+    Returns:
+        Formatted date/time string
+    """
+    return datetime.fromtimestamp(seconds).strftime(fmt)
+
 def format_dimensions(height: float, width: float, depth: float) -> str:
     """
     Format dimensions for display.